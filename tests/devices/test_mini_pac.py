@@ -33,9 +33,9 @@ class MiniPacDeviceTest(TestCase):
 
         # https://python-jsonschema.readthedocs.io/en/stable/
         with open(schema_file) as h:
-            self.mini_pac_schema = json.loads(h.read())
+            self.mini_pac_schema = json.load(h)
         with open(config_file) as h:
-            self.mini_pac_config = json.loads(h.read())
+            self.mini_pac_config = json.load(h)
 
     @patch.object(USBDeviceHandle, '_get_descriptor_fields', return_value=None)
     @patch('libusb.get_device', return_value='pointer')
@@ -159,6 +159,31 @@ class MiniPacDeviceTest(TestCase):
         self.assertFalse(valid)
         self.assertIsNone(data)
 
+    @patch.object(USBDeviceHandle, 'write_alt', return_value=True)
+    @patch.object(USBDeviceHandle, 'read_interrupt', side_effect=lambda endpoint, response: response)
+    @patch.object(USBDeviceHandle, 'write', return_value=True)
+    @patch.object(USBDeviceHandle, '_get_descriptor_fields', return_value=None)
+    @patch('libusb.get_device', return_value='pointer')
+    def test_mini_pac_configuration_cache(self, dev_handle_mock, lib_usb_mock, write_mock, read_mock,
+                                          write_alt_mock):
+        """ Test that recently read configurations are reused until forced or written """
+        dev = USBDeviceHandle('test_handle', '0000:0000')
+        dev.__class__ = MiniPacDevice
+
+        config = dev.get_current_configuration()
+        config.bytes[0] = 0x29
+        cached = dev.get_current_configuration()
+        self.assertEqual(read_mock.call_count, 1)
+        # Changes to a returned configuration must not leak into the cache.
+        self.assertEqual(cached.bytes[0], 0)
+
+        dev.get_current_configuration(force=True)
+        self.assertEqual(read_mock.call_count, 2)
+
+        self.assertTrue(dev._write_configuration_(config))
+        dev.get_current_configuration()
+        self.assertEqual(read_mock.call_count, 3)
+
     def test_get_ipac_series_debounce_key(self):
         """ Test the get_ipac_series_debounce_key function returns valid values """
 
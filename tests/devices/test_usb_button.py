@@ -0,0 +1,25 @@
+#
+# This file is subject to the terms and conditions defined in the
+# file 'LICENSE', which is part of this source code package.
+#
+from unittest import TestCase
+from unittest.mock import patch
+
+from ultimarc.devices.usb_button import USBButtonDevice
+
+
+class USBButtonDeviceTest(TestCase):
+
+    @patch.object(USBButtonDevice, 'write', return_value=True)
+    @patch.object(USBButtonDevice, 'claim_interface', return_value=None)
+    @patch('libusb.get_device', return_value='pointer')
+    def test_set_color_values(self, dev_handle_mock, claim_mock, write_mock):
+        """ Test that set_color() only accepts integer color values between 0 and 255 """
+        dev = USBButtonDevice('test_handle', '0000:0000')
+
+        self.assertTrue(dev.set_color(0, 0, 0))
+        self.assertTrue(dev.set_color(255, 128, 1))
+
+        for red, green, blue in [(256, 0, 0), (0, -1, 0), (0, 0, 1000), ('1', 0, 0), (0, 1.0, 0)]:
+            with self.assertRaises(ValueError):
+                dev.set_color(red, green, blue)
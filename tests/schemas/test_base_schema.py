@@ -5,9 +5,7 @@
 import json
 import os
 
-from glob import glob
-
-from jsonschema import validate
+from jsonschema.validators import validator_for
 from unittest import TestCase
 
 from ultimarc.system_utils import git_project_root
@@ -23,11 +21,16 @@ class USBButtonSchemaTest(TestCase):
         self.assertTrue(os.path.exists(schema_file))
         # https://python-jsonschema.readthedocs.io/en/stable/
         with open(schema_file) as h:
-            schema = json.loads(h.read())
+            schema = json.load(h)
+        validator = validator_for(schema)(schema)
 
         path = os.path.join(git_project_root(), 'ultimarc/examples/')
-        files = glob(os.path.join(path, "*.json"))
+        with os.scandir(path) as it:
+            # DirEntry.is_file() uses the cached directory entry type, avoiding a stat() per file.
+            files = [entry.path for entry in it
+                     if entry.name.endswith('.json') and entry.is_file(follow_symlinks=False)]
+        self.assertTrue(files)
         for file in files:
             with open(file) as h:
-                config = json.loads(h.read())
-            self.assertIsNone(validate(config, schema))
+                config = json.load(h)
+            self.assertIsNone(validator.validate(config))
@@ -32,9 +32,9 @@ class MiniPacSchemaTest(TestCase):
 
         # https://python-jsonschema.readthedocs.io/en/stable/
         with open(schema_file) as h:
-            self.mini_pac_schema = json.loads(h.read())
+            self.mini_pac_schema = json.load(h)
         with open(config_file) as h:
-            self.mini_pac_config = json.loads(h.read())
+            self.mini_pac_config = json.load(h)
 
     def test_mini_pac_good(self):
         """ Test that the test mini-pac config matches the mini-pac schema """
@@ -49,7 +49,7 @@ class MiniPacSchemaTest(TestCase):
         self.assertTrue(os.path.exists(bad_config_file))
 
         with open(bad_config_file) as h:
-            bad_config = json.loads(h.read())
+            bad_config = json.load(h)
 
         with self.assertRaises(ValidationError):
             validate(bad_config, self.mini_pac_schema)
@@ -60,7 +60,7 @@ class MiniPacSchemaTest(TestCase):
         self.assertTrue(os.path.exists(bad_config_file))
 
         with open(bad_config_file) as h:
-            bad_config = json.loads(h.read())
+            bad_config = json.load(h)
 
         with self.assertRaises(ValidationError):
             validate(bad_config, self.mini_pac_schema)
@@ -71,7 +71,7 @@ class MiniPacSchemaTest(TestCase):
         self.assertTrue(os.path.exists(bad_config_file))
 
         with open(bad_config_file) as h:
-            bad_config = json.loads(h.read())
+            bad_config = json.load(h)
 
         with self.assertRaises(ValidationError):
             validate(bad_config, self.mini_pac_schema)
@@ -84,6 +84,6 @@ class MiniPacSchemaTest(TestCase):
         self.assertTrue(os.path.exists(opt_config_file))
 
         with open(opt_config_file) as h:
-            opt_config = json.loads(h.read())
+            opt_config = json.load(h)
 
         self.assertIsNone(validate(opt_config, self.mini_pac_schema))
\ No newline at end of file
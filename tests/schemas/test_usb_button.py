@@ -28,9 +28,9 @@ class USBButtonSchemaTest(TestCase):
 
         # https://python-jsonschema.readthedocs.io/en/stable/
         with open(schema_file) as h:
-            self.color_schema = json.loads(h.read())
+            self.color_schema = json.load(h)
         with open(config_file) as h:
-            self.color_config = json.loads(h.read())
+            self.color_config = json.load(h)
 
     def test_button_color_good(self):
         """ Test that the test color config matches the color schema. """
@@ -2,13 +2,14 @@
 # This file is subject to the terms and conditions defined in the
 # file 'LICENSE', which is part of this source code package.
 #
+import ctypes as ct
 import os
 import logging
 
 from unittest import TestCase
 from unittest.mock import patch
 
-from ultimarc.devices._device import USBDeviceHandle
+from ultimarc.devices._device import USBDeviceHandle, USBRequestCode
 from ultimarc.system_utils import git_project_root
 
 
@@ -28,3 +29,51 @@ class USBDeviceHandleTest(TestCase):
 
         config_file = os.path.join(git_project_root(), 'tests/test-data/usb-button-color-bad.json')
         self.assertIsNone(dev.validate_config_base(config_file, ['usb-button-color']))
+
+    @patch.object(USBDeviceHandle, '_make_control_transfer', return_value=True)
+    @patch.object(USBDeviceHandle, '_get_descriptor_fields', return_value=None)
+    @patch('libusb.get_device', return_value='pointer')
+    def test_write_alt_chunking(self, dev_handle_mock, lib_usb_mock, transfer_mock):
+        """ Test the write_alt() method splits data into max_chunk sized transfers. """
+        dev = USBDeviceHandle('test_handle', '0000:0000')
+        dev.interface = 0
+        data = (ct.c_ubyte * 10)(*range(10))
+
+        # Record the bytes sent in each transfer, the payload buffer is reused between transfers.
+        sent = list()
+        transfer_mock.side_effect = lambda *args: sent.append(bytes(args[4]._obj)[:args[5]]) or True
+
+        self.assertTrue(dev.write_alt(USBRequestCode.SET_CONFIGURATION, 0x03, 0, data, ct.sizeof(data)))
+        self.assertEqual([c.args[5] for c in transfer_mock.call_args_list], [5, 5, 3])
+        self.assertEqual(sent, [bytes([3, 0, 1, 2, 3]), bytes([3, 4, 5, 6, 7]), bytes([3, 8, 9])])
+
+        transfer_mock.reset_mock()
+        self.assertTrue(dev.write_alt(USBRequestCode.SET_CONFIGURATION, 0x03, 0, data, ct.sizeof(data),
+                                      max_chunk=16))
+        self.assertEqual([c.args[5] for c in transfer_mock.call_args_list], [11])
+
+    @patch.object(USBDeviceHandle, '_get_descriptor_fields', return_value=None)
+    @patch('libusb.get_device', return_value='pointer')
+    def test_validate_config_missing_schema(self, dev_handle_mock, lib_usb_mock):
+        """ Test the validate_config() method fails when the schema file does not exist. """
+        dev = USBDeviceHandle('test_handle', '0000:0000')
+        self.assertFalse(dev.validate_config({}, 'does-not-exist.schema'))
+
+    @patch.object(USBDeviceHandle, '_get_descriptor_fields', return_value=None)
+    @patch('libusb.get_device', return_value='pointer')
+    def test_validate_config_resource(self, dev_handle_mock, lib_usb_mock):
+        """ Test the validate_config_resource() method of the USBDeviceHandle object. """
+        dev = USBDeviceHandle('test_handle', '0000:0000')
+        resource_schemas = {'usb-button-color': 'usb-button-color.schema'}
+
+        config_file = os.path.join(git_project_root(), 'tests/test-data/usb-button-color-good.json')
+        self.assertTrue(dev.validate_config_resource(config_file, resource_schemas))
+        self.assertIsNone(dev.validate_config_resource(config_file, {'bad-resource-type': 'base.schema'}))
+
+        config_file = os.path.join(git_project_root(), 'tests/test-data/usb-button-color-bad.json')
+        self.assertIsNone(dev.validate_config_resource(config_file, resource_schemas))
+        self.assertIsNone(dev.validate_config_resource(config_file, {'bad-resource-type': 'usb-button-color.schema'}))
+
+        # A non-string resourceType is rejected instead of raising an exception.
+        config_file = os.path.join(git_project_root(), 'tests/test-data/usb-button-resource-type-bad.json')
+        self.assertIsNone(dev.validate_config_resource(config_file, resource_schemas))
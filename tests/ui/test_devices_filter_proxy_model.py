@@ -0,0 +1,75 @@
+#
+# This file is subject to the terms and conditions defined in the
+# file 'LICENSE', which is part of this source code package.
+#
+from unittest import TestCase
+
+from PySide6.QtCore import QCoreApplication
+from PySide6.QtGui import QStandardItem, QStandardItemModel
+from PySide6.QtTest import QTest
+
+from ultimarc.ui.devices_filter_proxy_model import ClassFilterProxyModel, DevicesFilterProxyModel, \
+    FILTER_TEXT_DELAY
+from ultimarc.ui.devices_model import DeviceRoles
+
+
+class DevicesFilterProxyModelTest(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QCoreApplication.instance() or QCoreApplication([])
+
+    def setUp(self):
+        # Same chain as main.py: DevicesFilterProxyModel -> ClassFilterProxyModel -> devices.
+        self.devices = QStandardItemModel()
+        for class_id, search_blob in [('usb-button', 'ab usb'), ('mini-pac', 'zz'), ('mini-pac', 'abc mini')]:
+            item = QStandardItem()
+            item.setData(class_id, DeviceRoles.DEVICE_CLASS_ID)
+            item.setData(search_blob, DeviceRoles.SEARCH_BLOB)
+            self.devices.appendRow(item)
+
+        self.class_filter = ClassFilterProxyModel()
+        self.class_filter.setSourceModel(self.devices)
+        self.class_filter.front_page = False
+
+        self.device_filter = DevicesFilterProxyModel()
+        self.device_filter.setSourceModel(self.class_filter)
+        self.device_filter.front_page = False
+
+    def _set_filter_text(self, text):
+        """ Set the filter text and wait for the delayed filter pass """
+        self.device_filter.filter_text = text
+        QTest.qWait(FILTER_TEXT_DELAY * 3)
+
+    def _rows(self):
+        model = self.device_filter
+        return [model.index(row, 0).data(DeviceRoles.SEARCH_BLOB) for row in range(model.rowCount())]
+
+    def test_refine_after_class_filter_change(self):
+        """ Test that a growing filter text still finds rows after the class filter moved the source rows """
+        self._set_filter_text('ab')
+        self.assertEqual(self._rows(), ['ab usb', 'abc mini'])
+
+        self.class_filter.filter_class = 'mini-pac'
+        self.assertEqual(self._rows(), ['abc mini'])
+
+        self._set_filter_text('abc')
+        self.assertEqual(self._rows(), ['abc mini'])
+
+    def test_refine_filter_text(self):
+        """ Test that growing and shrinking the filter text shows the matching rows """
+        self._set_filter_text('a')
+        self.assertEqual(self._rows(), ['ab usb', 'abc mini'])
+        self._set_filter_text('abc')
+        self.assertEqual(self._rows(), ['abc mini'])
+        self._set_filter_text('ab')
+        self.assertEqual(self._rows(), ['ab usb', 'abc mini'])
+
+    def test_regex_filter_per_field(self):
+        """ Test that a regular expression filter only matches within a single field """
+        self.devices.item(0).setData('usb button\nusb-button\nd209:1200', DeviceRoles.SEARCH_BLOB)
+        self._set_filter_text('^usb-button$')
+        self.assertEqual(self._rows(), ['usb button\nusb-button\nd209:1200'])
+        for text in [r'button\susb', r'button[^x]usb', r'button\Wusb']:
+            self._set_filter_text(text)
+            self.assertEqual(self._rows(), [], text)
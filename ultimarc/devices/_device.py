@@ -10,9 +10,11 @@ import json
 import logging
 import os
 from enum import IntEnum
+from functools import cached_property, lru_cache
 from json import JSONDecodeError
 
-from jsonschema import validate, ValidationError
+from jsonschema import ValidationError
+from jsonschema.validators import validator_for
 import libusb as usb
 
 from ultimarc import translate_gettext as _
@@ -77,6 +79,42 @@ class USBRequestRecipient(IntEnum):
     RECIPIENT_OTHER = 0x03  # Other
 
 
+def _find_schema_dir():
+    """
+    Locate the schema directory, first relative to this package and then relative to
+    the current working directory.
+    :return: Absolute path to schema directory or None.
+    """
+    schema_paths = [
+        os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'schemas'),
+        './ultimarc/schemas', '../ultimarc/schemas', '../../ultimarc/schemas', '../schemas', './schemas'
+    ]
+    for path in schema_paths:
+        if os.path.isdir(path):
+            return os.path.realpath(path)
+    return None
+
+
+# The schema directory does not move while running, so only look it up once.
+_SCHEMA_DIR = _find_schema_dir()
+
+
+@lru_cache(maxsize=32)
+def _get_validator(schema_path):
+    """
+    Load a schema file and return a validator object for it. Results are cached by path so
+    each schema file is only read, checked and compiled once per process.
+    :param schema_path: Absolute path to schema file.
+    :return: jsonschema validator object.
+    """
+    with open(schema_path) as h:
+        schema = json.load(h)
+    cls = validator_for(schema)
+    # Check the schema against its meta-schema here, validator.validate() does not repeat this.
+    cls.check_schema(schema)
+    return cls(schema)
+
+
 def usb_error(code, msg, debug=False):
     """
     Return string containing error code in string format.
@@ -104,31 +142,46 @@ class USBDeviceHandle:
     class_descr = 'unset'  # Override in child classes.
     interface = None  # Interface to write and read from.
 
-    descriptor_fields = None  # List of available device property fields.
-
     def __init__(self, dev_handle, dev_key):
         self.__libusb_dev__ = usb.get_device(dev_handle)
         self.__libusb_dev_handle__ = dev_handle
         self.dev_key = dev_key
-        self.descriptor_fields = self._get_descriptor_fields()
+        # USB string descriptors are limited to 255 bytes, reuse one buffer for every lookup.
+        self._str_buf = ct.create_string_buffer(256)
+        # Scratch buffer for outgoing reports, report id plus 4 data bytes.
+        self._write_buf = (ct.c_ubyte * 5)()
 
         if self.interface is not None:
             self.claim_interface(self.interface)
 
+    @cached_property
+    def descriptor_fields(self):
+        """
+        Sorted tuple of available device property fields. The device descriptor is only
+        read from the device the first time this is accessed.
+        :return: tuple of strings.
+        """
+        return self._get_descriptor_fields()
+
+    @cached_property
+    def _descriptor_field_set(self):
+        """ Same fields as descriptor_fields, used for fast membership checks. """
+        return frozenset(self.descriptor_fields or ())
+
     def _get_descriptor_fields(self):
         """
-        Return a list of available descriptor property fields.
-        :return: list of strings.
+        Return a sorted tuple of available descriptor property fields.
+        :return: tuple of strings.
         """
         if not self.__libusb_dev_desc__:
             self.__libusb_dev_desc__ = usb.device_descriptor()
             usb.get_device_descriptor(self.__libusb_dev__, ct.byref(self.__libusb_dev_desc__))
-        fields = sorted([fld[0] for fld in self.__libusb_dev_desc__._fields_])
+        fields = tuple(sorted(fld[0] for fld in self.__libusb_dev_desc__._fields_))
 
         return fields
 
     def get_descriptor_value(self, prop_field):
-        if prop_field and prop_field in self.descriptor_fields:
+        if prop_field in self._descriptor_field_set:
             return getattr(self.__libusb_dev_desc__, prop_field)
         raise ValueError(_('Invalid descriptor property field name') + f' ({prop_field})')
 
@@ -138,7 +191,8 @@ class USBDeviceHandle:
         :param index: integer
         :return: String or None
         """
-        buf = ct.create_string_buffer(1024)
+        buf = self._str_buf
+        ct.memset(buf, 0, ct.sizeof(buf))
         ret = usb.get_string_descriptor_ascii(self.__libusb_dev_handle__, index, ct.cast(buf, ct.POINTER(ct.c_ubyte)),
                                               ct.sizeof(buf))
         if ret > 0:
@@ -261,7 +315,8 @@ class USBDeviceHandle:
         request_type = USBRequestDirection.ENDPOINT_OUT | request_type | recipient
         w_value = ct.c_uint16(USB_REPORT_TYPE_OUT.value | report_id.value)
 
-        payload = (ct.c_ubyte * 5)(0)
+        payload = self._write_buf
+        ct.memset(payload, 0, ct.sizeof(payload))
         payload[0] = report_id
 
         ct.memmove(ct.addressof(payload) + 1, ct.byref(data, 0),
@@ -271,11 +326,13 @@ class USBDeviceHandle:
         ret = self._make_control_transfer(request_type, b_request, w_value,
                                            w_index, payload_ptr,
                                            ct.sizeof(payload) if report_id else size)
-        _logger.debug(_(' '.join(hex(x) for x in payload)))
+        if _logger.isEnabledFor(logging.DEBUG):
+            _logger.debug(_(' '.join(hex(x) for x in payload)))
         return ret
 
     def write_alt(self, b_request, report_id, w_index, data=None, size=None,
-                  request_type=USBRequestType.REQUEST_TYPE_CLASS, recipient=USBRequestRecipient.RECIPIENT_INTERFACE):
+                  request_type=USBRequestType.REQUEST_TYPE_CLASS, recipient=USBRequestRecipient.RECIPIENT_INTERFACE,
+                  max_chunk=4):
         """
         Write message to USB device.
         :param b_request: Request field for the setup packet
@@ -285,6 +342,8 @@ class USBDeviceHandle:
         :param size: size of message.
         :param request_type: USBRequestType enum value.
         :param recipient: USBRequestRecipient enum value.
+        :param max_chunk: Maximum number of data bytes sent per control transfer. Ultimarc devices expect
+                          4 byte reports, only raise this for devices known to accept larger reports.
         :return: True if successful otherwise False.
         """
         if self.interface is None:
@@ -293,6 +352,8 @@ class USBDeviceHandle:
             raise ValueError('Request type argument must be a USBRequestType enum value.')
         if not isinstance(recipient, USBRequestRecipient):
             raise ValueError('Request type argument must be a USBRequestRecipient enum value.')
+        if not isinstance(max_chunk, int) or max_chunk < 1:
+            raise ValueError('Max chunk argument must be a positive integer.')
 
         if isinstance(report_id, int):
             report_id = ct.c_uint8(report_id)
@@ -301,27 +362,36 @@ class USBDeviceHandle:
         request_type = USBRequestDirection.ENDPOINT_OUT | request_type | recipient
         w_value = ct.c_uint16(USB_REPORT_TYPE_OUT.value | report_id.value)
 
-        payload = (ct.c_ubyte * 5)(0)
+        # Reuse the handle write buffer for standard sized reports.
+        payload = self._write_buf if max_chunk == 4 else (ct.c_ubyte * (max_chunk + 1))()
+        ct.memset(payload, 0, ct.sizeof(payload))
         offset = 1 if report_id else 0
         pos = 0
 
         if report_id:
             payload[0] = report_id
 
+        # Byte views of both buffers let each chunk be copied with a slice assignment.
+        payload_view = memoryview(payload).cast('B')
+        data_view = memoryview(data).cast('B')
+        payload_ptr = ct.byref(payload)
+        debug = _logger.isEnabledFor(logging.DEBUG)
+
         while pos < size:
-            payload_size = 4 if size - pos > 4 else size - pos
-            ct.memmove(ct.addressof(payload) + offset, ct.byref(data, pos), payload_size)
+            payload_size = max_chunk if size - pos > max_chunk else size - pos
+            payload_view[offset:offset + payload_size] = data_view[pos:pos + payload_size]
 
             ret = self._make_control_transfer(request_type, b_request, w_value,
-                                           w_index, ct.byref(payload), payload_size + offset)
+                                           w_index, payload_ptr, payload_size + offset)
             pos += payload_size
-            _logger.debug(_(' '.join(hex(x) for x in payload)))
+            if debug:
+                _logger.debug(_(' '.join(hex(x) for x in payload)))
 
         _logger.debug(_('Write operation complete, wrote {} bytes.').format(pos))
         return ret
 
     def read(self, b_request, w_value, w_index, data=None, size=None, request_type=USBRequestType.REQUEST_TYPE_CLASS,
-             recipient=USBRequestRecipient.RECIPIENT_INTERFACE):
+             recipient=USBRequestRecipient.RECIPIENT_INTERFACE, timeout=2000):
         """
         Read message from USB device.
         :param b_request: Request field for the setup packet
@@ -331,6 +401,7 @@ class USBDeviceHandle:
         :param size: size of message.
         :param request_type: Request type enum value.
         :param recipient: Recipient enum value.
+        :param timeout: Transfer timeout in milliseconds.
         :return: True if successful otherwise False.
         """
         if self.interface is None:
@@ -342,7 +413,8 @@ class USBDeviceHandle:
 
         # Combine direction, request type and recipient together.
         request_type = usb.LIBUSB_ENDPOINT_IN | request_type | recipient
-        return self._make_control_transfer(request_type, b_request, w_value, w_index, ct.byref(data), size)
+        return self._make_control_transfer(request_type, b_request, w_value, w_index, ct.byref(data), size,
+                                           timeout=timeout)
 
     def read_interrupt(self, endpoint, response, uses_report_id=True):
         """
@@ -358,6 +430,7 @@ class USBDeviceHandle:
         length = 5 if uses_report_id else 4  # Expecting the report_id in the message
         payload = (ct.c_ubyte * length)(0)
         payload_ptr = ct.byref(payload)
+        debug = _logger.isEnabledFor(logging.DEBUG)
 
         # Here don't add the report_id into the response structure, 4 instead of 5
         for pos in range(0, ct.sizeof(response), 4 if uses_report_id else 5):
@@ -368,32 +441,26 @@ class USBDeviceHandle:
             ct.memmove(ct.addressof(response)+pos,
                        ct.byref(payload, 1) if uses_report_id else ct.byref(payload),
                        actual_length.value)
-            _logger.debug(_(' '.join(hex(x) for x in payload)))
+            if debug:
+                _logger.debug(_(' '.join(hex(x) for x in payload)))
 
         return response
 
-    def load_config_schema(self, schema_file):
+    def _get_cached_validator(self, schema_file):
         """
-        Load the requested schema file.
+        Return a cached validator object for the requested schema file.
         :param schema_file: Schema file name only, no path included.
-        :return: schema dict.
+        :return: jsonschema validator object.
         """
-        schema_paths = [
-            './ultimarc/schemas', '../ultimarc/schemas', '../../ultimarc/schemas', '../schemas', './schemas'
-        ]
-        schema_path = None
-
-        for path in schema_paths:
-            schema_path = os.path.abspath(os.path.join(path, schema_file))
-            if os.path.exists(schema_path):
-                break
-
-        if not schema_path:
+        if not _SCHEMA_DIR:
             _logger.error(_('Unable to locate schema directory.'))
             return None
 
-        with open(schema_path) as h:
-            return json.loads(h.read())
+        try:
+            return _get_validator(os.path.join(_SCHEMA_DIR, schema_file))
+        except FileNotFoundError:
+            _logger.error(_('Unable to locate schema file') + f' ({schema_file}).')
+            return None
 
     def validate_config(self, config, schema_file):
         """
@@ -402,12 +469,12 @@ class USBDeviceHandle:
         :param schema_file: relative or abspath of schema.
         :return: True if valid otherwise False.
         """
-        schema = self.load_config_schema(schema_file)
-        if not schema:
+        validator = self._get_cached_validator(schema_file)
+        if not validator:
             return False
 
         try:
-            validate(config, schema)
+            validator.validate(config)
         except ValidationError as e:
             _logger.error(_('Configuration file did not validate against config schema.'))
             _logger.error(e)
@@ -423,19 +490,19 @@ class USBDeviceHandle:
         :return: config dict.
         """
         # Read the base schema, all json configs must validate against this schema.
-        base_schema = self.load_config_schema('base.schema')
-        if not base_schema:
+        validator = self._get_cached_validator('base.schema')
+        if not validator:
             return None
 
         try:
             with open(config_file) as h:
-                config = json.loads(h.read())
+                config = json.load(h)
         except JSONDecodeError:
             _logger.error(_('Configuration file is not valid JSON.'))
             return None
 
         try:
-            validate(config, base_schema)
+            validator.validate(config)
         except ValidationError as e:
             _logger.error(_('Configuration file did not validate against the base schema.') + f'\n{e}')
             return None
@@ -446,3 +513,31 @@ class USBDeviceHandle:
             return None
 
         return config
+
+    def validate_config_resource(self, config_file, resource_schemas):
+        """
+        Validate the configuration file against the schema for its resource type. Each resource schema
+        must also enforce the base schema fields, the configuration is then only validated once.
+        :param config_file: Absolute path to configuration json file.
+        :param resource_schemas: dict mapping valid 'resourceType' values to schema file names.
+        :return: config dict.
+        """
+        try:
+            with open(config_file) as h:
+                config = json.load(h)
+        except JSONDecodeError:
+            _logger.error(_('Configuration file is not valid JSON.'))
+            return None
+
+        resource_type = config.get('resourceType') if isinstance(config, dict) else None
+        # A malformed 'resourceType', like a list, can not be a resource_schemas key.
+        schema_file = resource_schemas.get(resource_type) if isinstance(resource_type, str) else None
+        if not schema_file:
+            valid_types = ",".join(resource_schemas)
+            _logger.error(_('Resource type does not match accepted types') + f' ({valid_types}).')
+            return None
+
+        if not self.validate_config(config, schema_file):
+            return None
+
+        return config
@@ -5,6 +5,7 @@
 import ctypes as ct
 import json
 import logging
+import time
 
 from ultimarc import translate_gettext as _
 from ultimarc.devices._device import USBDeviceHandle, USBRequestCode
@@ -21,6 +22,8 @@ MACRO_START_INDEX = 166
 # overall total macro characters is 85
 MACRO_MAX_COUNT = 30
 MACRO_MAX_SIZE = 85
+# Seconds a configuration read from the device is reused before reading it again.
+CONFIG_CACHE_TTL = 0.25
 
 # Pin mapping for Mini-pac device
 # code_index: Normal action
@@ -69,6 +72,9 @@ class MiniPacDevice(USBDeviceHandle):
     class_descr = _('Mini-PAC')
     interface = 2
 
+    _config_cache_ = None  # Last configuration read from the device.
+    _config_cache_ts_ = 0.0  # time.monotonic() value when the configuration was read.
+
     def _create_macro_array_(self, pac_struct):
         # macros
         macros = []
@@ -156,12 +162,34 @@ class MiniPacDevice(USBDeviceHandle):
         else:
             return json.dumps(json_obj, indent=indent) if config else None
 
-    def get_current_configuration(self):
-        """ Return the current Mini-PAC pins configuration """
+    def get_current_configuration(self, force=False):
+        """
+        Return the current Mini-PAC pins configuration. A configuration read within the last
+        CONFIG_CACHE_TTL seconds is reused instead of reading it from the device again.
+        :param force: Always read the configuration from the device.
+        :return: PacStruct or None
+        """
+        if not force and self._config_cache_ is not None and \
+                time.monotonic() - self._config_cache_ts_ < CONFIG_CACHE_TTL:
+            # Callers modify the returned structure, so always hand out a copy.
+            return PacStruct.from_buffer_copy(self._config_cache_)
+
         request = PacHeaderStruct(0x59, 0xdd, 0x0f, 0)
         ret = self.write(USBRequestCode.SET_CONFIGURATION, int(0x03), MINI_PAC_INDEX,
                          request, ct.sizeof(request))
-        return self.read_interrupt(0x84, PacStruct()) if ret else None
+        if not ret:
+            return None
+
+        config = self.read_interrupt(0x84, PacStruct())
+        self._config_cache_ = PacStruct.from_buffer_copy(config)
+        self._config_cache_ts_ = time.monotonic()
+        return config
+
+    def _write_configuration_(self, data):
+        """ Write a complete PacStruct configuration to the device """
+        # The device configuration is about to change, drop the cached copy.
+        self._config_cache_ = None
+        return self.write_alt(USBRequestCode.SET_CONFIGURATION, int(0x03), MINI_PAC_INDEX, data, ct.sizeof(data))
 
     def set_config(self, config_file, use_current):
         """ Write a new configuration to the current Mini-PAC device """
@@ -171,8 +199,7 @@ class MiniPacDevice(USBDeviceHandle):
 
         # Insert the new configuration into the PacStruct data object
         res, data = self._create_message_(config_file, cur_config)
-        return self.write_alt(USBRequestCode.SET_CONFIGURATION, int(0x03), MINI_PAC_INDEX, data, ct.sizeof(data)) \
-            if res else False
+        return self._write_configuration_(data) if res else False
 
     def set_pin(self, pin_config):
         """ Write a pin to the current Mini-pac device """
@@ -224,8 +251,7 @@ class MiniPacDevice(USBDeviceHandle):
         cur_config.header.byte_2 = 0xdd
         cur_config.header.byte_3 = 0x0f
 
-        return self.write_alt(USBRequestCode.SET_CONFIGURATION, int(0x03), MINI_PAC_INDEX,
-                              cur_config, ct.sizeof(cur_config))
+        return self._write_configuration_(cur_config)
 
     def set_debounce(self, debounce):
         """ Set debounce value to the current Mini-pac device """
@@ -247,8 +273,7 @@ class MiniPacDevice(USBDeviceHandle):
         cur_config.header.byte_2 = 0xdd
         cur_config.header.byte_3 = 0x0f
 
-        return self.write_alt(USBRequestCode.SET_CONFIGURATION, int(0x03), MINI_PAC_INDEX,
-                              cur_config, ct.sizeof(cur_config))
+        return self._write_configuration_(cur_config)
 
     def _create_message_(self, config_file, cur_device_config=None):
         """ Create the message to be sent to the device """
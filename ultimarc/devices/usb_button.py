@@ -4,6 +4,7 @@
 #
 import ctypes as ct
 import logging
+import time
 from enum import IntEnum
 
 from ultimarc import translate_gettext as _
@@ -19,6 +20,8 @@ _logger = logging.getLogger('ultimarc')
 USBButtonReportID = 0x0200
 USBButtonWIndex = 0x0
 PACKETSIZE = 64
+READ_ATTEMPTS = 3  # Number of times to try reading from the button before giving up.
+READ_TIMEOUT = 500  # Milliseconds, the button responds almost immediately when healthy.
 ROWARRAY = ct.c_uint8 * 6
 
 
@@ -60,14 +63,7 @@ class USBButtonConfigStruct(UltimarcStruct):
         ('reserved', ct.c_uint8),  # Must be 0x00.
         ('releasedRGB', RGBValueStruct),
         ('pressedRGB', RGBValueStruct),
-        ('row1', ROWARRAY),
-        ('row2', ROWARRAY),
-        ('row3', ROWARRAY),
-        ('row4', ROWARRAY),
-        ('row5', ROWARRAY),
-        ('row6', ROWARRAY),
-        ('row7', ROWARRAY),
-        ('row8', ROWARRAY),
+        ('rows', ROWARRAY * 8),  # Primary key sequence rows 1-4, then secondary sequence rows 1-4.
         ('padding', ROWARRAY)
     ]
 
@@ -101,9 +97,9 @@ class USBButtonDevice(USBDeviceHandle):
         :param blue: integer between 0 and 255
         :return: True if successful otherwise False.
         """
-        for color in [red, green, blue]:
-            if not isinstance(color, int) or not 0 <= color <= 255:
-                raise ValueError(_('Color argument value is invalid'))
+        # Any bits set above the low byte means a value is negative or larger than 255.
+        if type(red) is not int or type(green) is not int or type(blue) is not int or (red | green | blue) & ~0xFF:
+            raise ValueError(_('Color argument value is invalid'))
 
         data = USBButtonColorStruct(0x01, RGBValueStruct(red, green, blue))
         return self.write(USBRequestCode.SET_CONFIGURATION, USBButtonReportID, USBButtonWIndex, data, ct.sizeof(data))
@@ -115,9 +111,13 @@ class USBButtonDevice(USBDeviceHandle):
         :return: (Integer, Integer, Integer) or None
         """
         data = USBButtonColorStruct(0x01, RGBValueStruct(0x0, 0x0, 0x0))
-        ret = self.read(USBRequestCode.CLEAR_FEATURE, USBButtonReportID, USBButtonWIndex, data, ct.sizeof(data))
-        if ret:
-            return data.red, data.green, data.blue
+        for attempt in range(READ_ATTEMPTS):
+            if self.read(USBRequestCode.CLEAR_FEATURE, USBButtonReportID, USBButtonWIndex, data, ct.sizeof(data),
+                         timeout=READ_TIMEOUT):
+                return data.rgb.red, data.rgb.green, data.rgb.blue
+            # Back off a little longer after each failed attempt.
+            if attempt < READ_ATTEMPTS - 1:
+                time.sleep(0.01 * (1 << attempt))
         _logger.error(_('Failed to read color data from usb button.'))
         return None, None, None
 
@@ -128,13 +128,19 @@ class USBButtonDevice(USBDeviceHandle):
         :param application: Permanent or temporary application of configuration to device.
         :return: True if successful otherwise False.
         """
-        # List of possible 'resourceType' values in the config file for a USB button.
-        resource_types = ['usb-button-color', 'usb-button-config']
-
-        # Validate against the base schema.
-        config = JSONObject(self.validate_config_base(config_file, resource_types))
-        if not config:
+        # Possible 'resourceType' values in the config file for a USB button and their schemas.
+        resource_schemas = {
+            'usb-button-color': 'usb-button-color.schema',
+            'usb-button-config': 'usb-button-config.schema'
+        }
+
+        # Validate against the resource type schema, these schemas include the base schema fields.
+        valid_config = self.validate_config_resource(config_file, resource_schemas)
+        if not valid_config:
             return False
+        _logger.debug(_('Device JSON configuration passed schema validation.'))
+
+        config = JSONObject(valid_config)
 
         if config.deviceClass != 'usb-button':
             _logger.error(_('Configuration device class is not "usb-button".'))
@@ -142,19 +148,12 @@ class USBButtonDevice(USBDeviceHandle):
 
         # Determine which config resource type we have.
         if config.resourceType == 'usb-button-color':
-            if not self.validate_config(config.to_dict(), 'usb-button-color.schema'):
-                return False
-            _logger.debug(_('Device JSON configuration passed schema validation.'))
             data = USBButtonColorStruct(0x01,
                             RGBValueStruct(config.colorRGB.red, config.colorRGB.green, config.colorRGB.blue))
             return self.write(USBRequestCode.SET_CONFIGURATION, USBButtonReportID, USBButtonWIndex, data,
                               ct.sizeof(data))
 
         # Process usb-button-config data
-        if not self.validate_config(config.to_dict(), 'usb-button-config.schema'):
-            return False
-        _logger.debug(_('Device JSON configuration passed schema validation.'))
-
         action = ButtonModeMapping[config.action]
 
         released_rgb = RGBValueStruct(config.releasedColor.red, config.releasedColor.green, config.releasedColor.blue)
@@ -180,9 +179,10 @@ class USBButtonDevice(USBDeviceHandle):
             row_keys.append(row_to_struct(key.row2))
             row_keys.append(row_to_struct(key.row3))
             row_keys.append(row_to_struct(key.row4))
-        row_keys.append(ROWARRAY(0))  # Add padding data, this is probably used by the bluetooth usb button.
 
-        data = USBButtonConfigStruct(application, 0xdd, action, 0x00, released_rgb, pressed_rgb, *row_keys)
+        # Padding data is left zeroed, this is probably used by the bluetooth usb button.
+        data = USBButtonConfigStruct(application, 0xdd, action, 0x00, released_rgb, pressed_rgb,
+                                     (ROWARRAY * 8)(*row_keys))
 
         _logger.debug(_(' application') + f': {application.name}')
         _logger.debug(_(' action') + f': {config.action}')
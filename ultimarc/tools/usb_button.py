@@ -9,6 +9,7 @@ import os
 import random
 import re
 import sys
+from concurrent.futures import ThreadPoolExecutor
 
 from ultimarc import translate_gettext as _
 from ultimarc.devices import DeviceClassID
@@ -22,7 +23,8 @@ _logger = logging.getLogger('ultimarc')
 tool_cmd = _('usb-button')
 tool_desc = _('manage usb-button devices.')
 
-_RGB_STRING_REGEX = r"^.*?([0-9]{1,3}),\s*?([0-9]{1,3}),\s*?([0-9]{1,3})+.*?$"
+_MAX_WORKERS = 8  # Maximum number of devices to communicate with at the same time.
+_RGB_RE = re.compile(r"^.*?([0-9]{1,3}),\s*?([0-9]{1,3}),\s*?([0-9]{1,3})+.*?$")
 
 
 class USBButtonClass(object):
@@ -36,6 +38,23 @@ class USBButtonClass(object):
         self.args = args
         self.env = env
 
+    @staticmethod
+    def _for_each_device(devices, func, *iterables):
+        """
+        Open each device and call func with the device handle. Devices are handled in a thread pool
+        so the USB transfers to separate devices overlap.
+        :param devices: list of USBDeviceInfo objects.
+        :param func: callable, called with the device handle plus one item from each iterable.
+        :param iterables: optional per device arguments, in the same order as devices.
+        :return: list of func return values, in the same order as devices.
+        """
+        def _apply(dev, *args):
+            with dev as dev_h:
+                return func(dev_h, *args)
+
+        with ThreadPoolExecutor(max_workers=min(_MAX_WORKERS, len(devices))) as executor:
+            return list(executor.map(_apply, devices, *iterables))
+
     def run(self):
         """
         Main program process
@@ -52,45 +71,41 @@ class USBButtonClass(object):
 
         # See if we are setting a color from the command line args.
         if self.args.set_color:
-            match = re.match(_RGB_STRING_REGEX, self.args.set_color)
-            red, green, blue = match.groups()
+            match = _RGB_RE.match(self.args.set_color)
+            red, green, blue = [int(c) for c in match.groups()]
+            self._for_each_device(devices, lambda dev_h: dev_h.set_color(red, green, blue))
             for dev in devices:
-                with dev as dev_h:
-                    dev_h.set_color(int(red), int(green), int(blue))
-                    _logger.info(f'{dev.dev_key} ({dev.bus},{dev.address}): ' +
-                                 _('Color') + f': RGB({red},{green},{blue}).')
+                _logger.info(f'{dev.dev_key} ({dev.bus},{dev.address}): ' +
+                             _('Color') + f': RGB({red},{green},{blue}).')
 
         # Return the current color RGB values.
         elif self.args.get_color:
-            for dev in devices:
-                with dev as dev_h:
-                    red, green, blue = dev_h.get_color()
-                    if red is not None:
-                        _logger.info(f'{dev.dev_key} ({dev.bus},{dev.address}): ' +
-                                     _('Color') + f': RGB({red},{green},{blue}).')
+            colors = self._for_each_device(devices, lambda dev_h: dev_h.get_color())
+            for dev, (red, green, blue) in zip(devices, colors):
+                if red is not None:
+                    _logger.info(f'{dev.dev_key} ({dev.bus},{dev.address}): ' +
+                                 _('Color') + f': RGB({red},{green},{blue}).')
 
         # Set a random RGB color.
         elif self.args.set_random_color:
-            for dev in devices:
-                red = random.randrange(255)
-                green = random.randrange(255)
-                blue = random.randrange(255)
-                with dev as dev_h:
-                    dev_h.set_color(red, green, blue)
+            colors = [(random.randrange(255), random.randrange(255), random.randrange(255)) for dev in devices]
+            self._for_each_device(devices, lambda dev_h, rgb: dev_h.set_color(*rgb), colors)
+            for dev, (red, green, blue) in zip(devices, colors):
                 _logger.info(f'{dev.dev_key} ({dev.bus},{dev.address}): ' +
                              _('randomly set button color to') + f' RGB({red},{green},{blue}).')
 
         # Apply a usb button config.
         elif self.args.set_config:
-            for dev in devices:
-                with dev as dev_h:
-                    application = ConfigApplication.temporary if self.args.temporary else ConfigApplication.permanent
-                    if dev_h.set_config(self.args.set_config, application):
-                        _logger.info(f'{dev.dev_key} ({dev.bus},{dev.address}): ' +
+            application = ConfigApplication.temporary if self.args.temporary else ConfigApplication.permanent
+            results = self._for_each_device(devices,
+                                            lambda dev_h: dev_h.set_config(self.args.set_config, application))
+            for dev, result in zip(devices, results):
+                if result:
+                    _logger.info(f'{dev.dev_key} ({dev.bus},{dev.address}): ' +
                                  _('configuration successfully applied to device.'))
-                    else:
-                        _logger.error(f'{dev.dev_key} ({dev.bus},{dev.address}): ' +
-                                     _('failed to apply configuration to device.'))
+                else:
+                    _logger.error(f'{dev.dev_key} ({dev.bus},{dev.address}): ' +
+                                  _('failed to apply configuration to device.'))
 
         return 0
 
@@ -124,7 +139,7 @@ def run():
         return -1
 
     if args.set_color:
-        if not re.match(_RGB_STRING_REGEX, args.set_color):
+        if not _RGB_RE.match(args.set_color):
             _logger.error(_('Invalid RGB value found for --set-color argument.'))
             return -1
 
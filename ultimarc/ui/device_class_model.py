@@ -2,12 +2,12 @@
 # This file is subject to the terms and conditions defined in the
 # file 'LICENSE', which is part of this source code package.
 #
-from PySide6.QtCore import QAbstractListModel, QObject, QMetaEnum, QModelIndex
+from PySide6.QtCore import QAbstractListModel, QMetaEnum, QModelIndex
 
 from ultimarc.devices import DeviceClassID
 
 
-class DeviceClassModel(QAbstractListModel, QObject):
+class DeviceClassModel(QAbstractListModel):
     def __init__(self):
         super().__init__()
 
@@ -5,14 +5,22 @@
 import logging
 import re
 
-from PySide6.QtCore import Property, Signal, QModelIndex, QObject, QSortFilterProxyModel, Slot
+from PySide6.QtCore import Property, Signal, QModelIndex, QRegularExpression, QSortFilterProxyModel, \
+    QTimer, Slot
 
 from ultimarc.ui.devices_model import DeviceRoles
 
 _logger = logging.getLogger('ultimarc')
 
+# Filter text without any of these characters is plain text and can use a substring search.
+_REGEX_META_RE = re.compile(r'[.^$*+?{}\[\]\\|()]')
+# Same as _REGEX_META_RE without '|', filter text like 'ipac|mini-pac' is a list of plain text alternatives.
+_ALTERNATION_META_RE = re.compile(r'[.^$*+?{}\[\]\\()]')
+# Milliseconds to wait for more filter text changes before filtering the rows again.
+FILTER_TEXT_DELAY = 80
 
-class ClassFilterProxyModel(QSortFilterProxyModel, QObject):
+
+class ClassFilterProxyModel(QSortFilterProxyModel):
     _changed_front_page_ = Signal(bool)
     _changed_filter_class_ = Signal(str)
 
@@ -21,6 +29,16 @@ class ClassFilterProxyModel(QSortFilterProxyModel, QObject):
 
     def __init__(self):
         super().__init__()
+        # Rows are filtered by Qt on the device class id role, see _update_filter_().
+        self.setFilterRole(DeviceRoles.DEVICE_CLASS_ID)
+
+    def _update_filter_(self):
+        """ Set the Qt filter expression, an empty expression accepts every row """
+        if self._front_page_ or self._filter_class_ == 'all':
+            self.setFilterRegularExpression('')
+        else:
+            self.setFilterRegularExpression(
+                QRegularExpression.anchoredPattern(QRegularExpression.escape(self._filter_class_)))
 
     def get_front_page(self):
         return self._front_page_
@@ -29,7 +47,7 @@ class ClassFilterProxyModel(QSortFilterProxyModel, QObject):
         if self._front_page_ != fp:
             self._front_page_ = fp
             self._changed_front_page_.emit(self._front_page_)
-            self.invalidateFilter()
+            self._update_filter_()
 
     def get_filter_class(self):
         return self._filter_class_
@@ -39,25 +57,13 @@ class ClassFilterProxyModel(QSortFilterProxyModel, QObject):
             # _logger.debug(f'class filter: set_filter_class {new_filter}')
             self._filter_class_ = new_filter
             self._changed_filter_class_.emit(self._filter_class_)
-            self.invalidateFilter()
+            self._update_filter_()
 
     front_page = Property(bool, get_front_page, set_front_page, notify=_changed_front_page_)
     filter_class = Property(str, get_filter_class, set_filter_class, notify=_changed_filter_class_)
 
-    def filterAcceptsRow(self, source_row, source_parent: QModelIndex):
-        index = self.sourceModel().index(source_row, 0, source_parent)
-        if self.front_page:
-            return True
-        else:
-            if self._filter_class_ == 'all':
-                return True
-            else:
-                device_class_id = index.data(DeviceRoles.DEVICE_CLASS_ID)
-                cb_filter = device_class_id == self._filter_class_
-                return cb_filter
-
 
-class DevicesFilterProxyModel(QSortFilterProxyModel, QObject):
+class DevicesFilterProxyModel(QSortFilterProxyModel):
     _changed_front_page_ = Signal(bool)
     _changed_filter_class_ = Signal(str)
     _changed_filter_text_ = Signal(str)
@@ -65,11 +71,24 @@ class DevicesFilterProxyModel(QSortFilterProxyModel, QObject):
 
     _front_page_ = True
     _filter_text_ = ''
+    _filter_pattern_ = None  # Compiled _filter_text_, None when there is no filter text.
+    _filter_needle_ = None  # Lower case _filter_text_ when it is plain text, otherwise None.
+    _filter_needles_ = None  # Lower case alternatives when _filter_text_ is only plain text joined by '|'.
+    _accepted_rows_ = None  # Source rows accepted by the plain text filter, see _refilter_text_().
+    _accepted_needle_ = None  # The _filter_needle_ used to build _accepted_rows_.
+    _refine_ = False  # True while re-filtering only needs to re-test rows in _accepted_rows_.
     _filter_class_ = 0
     _selected_index_ = -1
+    _selected_data_ = None  # Role values of the selected row by role name, see get_property().
 
     def __init__(self):
         super().__init__()
+        self._selected_data_ = {}
+        # Collapse a burst of filter text changes, like typing a word, into a single filter pass.
+        self._filter_timer_ = QTimer(self)
+        self._filter_timer_.setSingleShot(True)
+        self._filter_timer_.setInterval(FILTER_TEXT_DELAY)
+        self._filter_timer_.timeout.connect(self._refilter_text_)
 
     def get_front_page(self):
         return self._front_page_
@@ -86,8 +105,47 @@ class DevicesFilterProxyModel(QSortFilterProxyModel, QObject):
     def set_filter_text(self, new_filter):
         if self._filter_text_ != new_filter:
             self._filter_text_ = new_filter
+            self._filter_pattern_ = self._compile_filter_(new_filter)
+            self._filter_needle_ = new_filter.lower() \
+                if new_filter and not _REGEX_META_RE.search(new_filter) else None
+            self._filter_needles_ = self._split_alternatives_(new_filter)
             self._changed_filter_text_.emit(self._filter_text_)
-            self.invalidateFilter()
+            self._filter_timer_.start()
+
+    def _refilter_text_(self):
+        """ Filter the rows again after the filter text changed """
+        needle = self._filter_needle_
+        # A row without the previous plain text needle can not contain a longer needle that includes it,
+        # so only the rows accepted last time need to be tested again.
+        self._refine_ = needle is not None and self._accepted_needle_ is not None and \
+            self._accepted_needle_ in needle
+        if not self._refine_:
+            self._accepted_rows_ = set()
+        self._accepted_needle_ = needle
+        self.invalidateFilter()
+        self._refine_ = False
+
+    @staticmethod
+    def _compile_filter_(filter_text):
+        """ Compile the filter text once so rows are not matched against an uncompiled pattern """
+        if not filter_text:
+            return None
+        # Expressions are matched against each SEARCH_BLOB field on its own, see filterAcceptsRow().
+        flags = re.IGNORECASE
+        try:
+            return re.compile(filter_text, flags)
+        except re.error:
+            # Incomplete expressions are common while typing, match them as plain text.
+            return re.compile(re.escape(filter_text), flags)
+
+    @staticmethod
+    def _split_alternatives_(filter_text):
+        """ Return the lower case alternatives of plain text joined by '|', otherwise None """
+        if '|' not in filter_text or _ALTERNATION_META_RE.search(filter_text):
+            return None
+        needles = tuple(filter_text.lower().split('|'))
+        # An empty alternative matches every row, leave that to the regular expression.
+        return None if '' in needles else needles
 
     def get_filter_class(self):
         return self._filter_class_
@@ -98,9 +156,34 @@ class DevicesFilterProxyModel(QSortFilterProxyModel, QObject):
             self._changed_filter_class_.emit(self._filter_class_)
             self.invalidateFilter()
 
+    def setSourceModel(self, source_model):
+        old_model = self.sourceModel()
+        if old_model is not None:
+            for signal in self._source_change_signals_(old_model):
+                signal.disconnect(self._source_changed_)
+        super().setSourceModel(source_model)
+        self._source_changed_()
+        if source_model is not None:
+            for signal in self._source_change_signals_(source_model):
+                signal.connect(self._source_changed_)
+
+    @staticmethod
+    def _source_change_signals_(model):
+        """ Source model signals that may change the data of the selected row or move source rows """
+        return (model.dataChanged, model.modelReset, model.layoutChanged,
+                model.rowsInserted, model.rowsRemoved, model.rowsMoved)
+
+    def _source_changed_(self, *args):
+        self._selected_data_.clear()
+        # _accepted_rows_ holds source row numbers, they are stale once the source rows change,
+        # so the next filter pass has to test every row again.
+        self._accepted_rows_ = None
+        self._accepted_needle_ = None
+
     def set_selected_index(self, row):
         if self._selected_index_ != row:
             self._selected_index_ = row
+            self._selected_data_.clear()
             self._changed_selected_index_.emit()
 
     def get_selected_index(self):
@@ -108,30 +191,54 @@ class DevicesFilterProxyModel(QSortFilterProxyModel, QObject):
 
     @Slot(str, result=str)
     def get_property(self, p):
+        # The QML bindings ask for the same few roles every time the selection changes, only look each one up once.
+        try:
+            return self._selected_data_[p]
+        except KeyError:
+            pass
         index = self.sourceModel().index(self._selected_index_, 0)
         # _logger.debug(f'get_property slot: {p}, {DeviceRoles[p]}, {index.data(DeviceRoles[p])}')
-        return index.data(DeviceRoles[p])
+        value = self._selected_data_[p] = index.data(DeviceRoles[p])
+        return value
 
     selected_index = Property(int, get_selected_index, set_selected_index, notify=_changed_selected_index_)
     front_page = Property(bool, get_front_page, set_front_page, notify=_changed_front_page_)
     filter_text = Property(str, get_filter_text, set_filter_text, notify=_changed_filter_text_)
 
     def filterAcceptsRow(self, source_row, source_parent: QModelIndex):
-        index = self.sourceModel().index(source_row, 0, source_parent)
-        if self.front_page:
-            connected = index.data(DeviceRoles.CONNECTED)
-            return True if connected and source_row < 4 else False
+        # Called for every row, read the private fields directly, the getters are only for the QML Properties.
+        if self._front_page_:
+            # Only the first four rows can be shown on the front page, check that before asking for data.
+            if source_row >= 4:
+                return False
+            index = self.sourceModel().index(source_row, 0, source_parent)
+            return bool(index.data(DeviceRoles.CONNECTED))
         else:
-            if len(self._filter_text_) == 0:
+            pattern = self._filter_pattern_
+            if pattern is None:
                 return True
             else:
-                product_name = index.data(DeviceRoles.PRODUCT_NAME)
-                device_class = index.data(DeviceRoles.DEVICE_CLASS)
-                product_key = index.data(DeviceRoles.PRODUCT_KEY)
-
-                re_name = re.search(self._filter_text_, product_name, re.IGNORECASE) is not None
-                re_class = re.search(self._filter_text_, device_class, re.IGNORECASE) is not None
-                re_key = re.search(self._filter_text_, product_key, re.IGNORECASE) is not None
-                re_filter = re_name or re_class or re_key
-                # _logger.debug(f're filter ({name}: {re_filter}')
-                return re_filter
+                # SEARCH_BLOB is the lower cased product name, device class and product key, one field per line.
+                needle = self._filter_needle_
+                if needle is None:
+                    index = self.sourceModel().index(source_row, 0, source_parent)
+                    blob = index.data(DeviceRoles.SEARCH_BLOB)
+                    needles = self._filter_needles_
+                    if needles is not None:
+                        return any(n in blob for n in needles)
+                    # Search each field on its own, otherwise '\s', '\W' or '[^x]' could match across the
+                    # newline between two fields.
+                    return any(pattern.search(field) for field in blob.split('\n'))
+
+                accepted_rows = self._accepted_rows_
+                if accepted_rows is None:
+                    accepted_rows = self._accepted_rows_ = set()
+                elif self._refine_ and source_row not in accepted_rows:
+                    return False
+                index = self.sourceModel().index(source_row, 0, source_parent)
+                accepted = needle in index.data(DeviceRoles.SEARCH_BLOB)
+                if accepted:
+                    accepted_rows.add(source_row)
+                else:
+                    accepted_rows.discard(source_row)
+                return accepted
@@ -6,7 +6,7 @@ import logging
 from collections import OrderedDict
 
 from enum import IntEnum
-from PySide6.QtCore import QAbstractListModel, QModelIndex, QObject, Property, Signal
+from PySide6.QtCore import QAbstractListModel, QModelIndex, Property, Signal
 
 from ultimarc.devices import DeviceClassID
 from ultimarc.tools import ToolEnvironmentObject
@@ -24,6 +24,7 @@ class DeviceRoles(IntEnum):
     ICON = 5
     CONNECTED = 6
     DEVICE_CLASS_ID = 7
+    SEARCH_BLOB = 8  # Lower cased product_name, device_class and product_key, one per line.
 
 
 # Map Role Enum values to class property names.
@@ -38,6 +39,7 @@ class UIDeviceInfo():
     product_key = ''
     icon = ''
     connected = True
+    search_blob = ''
 
     def __init__(self, connected=True, device_class='Unknown class', product_name='Unknown Name', product_key=''):
         self.connected = connected
@@ -60,8 +62,12 @@ class UIDeviceInfo():
         else:
             self.icon = 'qrc:/logos/placeholder'
 
+    def setup_search_blob(self):
+        """ Pre-compute the text searched by the filter proxy model, so a row is searched with one data() call """
+        self.search_blob = f'{self.product_name}\n{self.device_class}\n{self.product_key}'.lower()
 
-class DevicesModel(QAbstractListModel, QObject):
+
+class DevicesModel(QAbstractListModel):
     """ List model that accesses the devices for the view """
     def __init__(self, args, env: (ToolEnvironmentObject, None)):
         super().__init__()
@@ -80,12 +86,14 @@ class DevicesModel(QAbstractListModel, QObject):
             tmp = UIDeviceInfo(product_name=dev.product_name, device_class=dev.class_descr,
                                product_key=dev.dev_key)
             tmp.setup_icon(dev.class_id)
+            tmp.setup_search_blob()
             self._ui_dev_info_.append(tmp)
 
         # Configuration for non connected devices
         for device_class in DeviceClassID:
             tmp = UIDeviceInfo(False, device_class=device_class.name)
             tmp.setup_icon(device_class.value)
+            tmp.setup_search_blob()
             self._ui_dev_info_.append(tmp)
 
     def get_devices(self):
@@ -4,14 +4,14 @@
 #
 import logging
 
-from PySide6.QtCore import QModelIndex, QObject, QSortFilterProxyModel
+from PySide6.QtCore import QModelIndex, QSortFilterProxyModel
 
 from ultimarc.ui.devices_model import DeviceRoles
 
 _logger = logging.getLogger('ultimarc')
 
 
-class DevicesSortProxyModel(QSortFilterProxyModel, QObject):
+class DevicesSortProxyModel(QSortFilterProxyModel):
     def __init__(self):
         super().__init__()
         self.sort(0)